@@ -10,94 +10,123 @@ Usage: python netskope_url_sanitizer.py input_file.txt [output_file.txt]
 
 import sys
 import re
-import urllib.parse
-from typing import List, Set, Optional
+from typing import Dict, Iterator, List, Match, Optional, TextIO, Tuple
 import argparse
+from collections import Counter
+
+
+# Valid hostname: dot-separated labels of letters, digits and dashes,
+# no label may be empty or start/end with a dash
+HOSTNAME_REGEX = r'(?!-)[a-zA-Z0-9\-]+(?<!-)(?:\.(?!-)[a-zA-Z0-9\-]+(?<!-))*'
 
 
 class NetskopeURLSanitizer:
-    def __init__(self):
-        # Valid characters for hostname (letters, digits, dashes)
-        self.hostname_pattern = re.compile(r'^[a-zA-Z0-9\-\.]+$')
-        # Pattern for valid wildcard (*.domain.com)
-        self.wildcard_pattern = re.compile(r'^\*\.[a-zA-Z0-9\-\.]+$')
-        # Comment patterns
-        self.comment_pattern = re.compile(r'^[#;]')
-        
-    def is_valid_hostname(self, hostname: str) -> bool:
+    # Patterns are compiled once at import and shared by all instances
+    hostname_pattern = re.compile(HOSTNAME_REGEX)
+    # Pattern for valid wildcard (*.domain.com)
+    wildcard_pattern = re.compile(r'^\*\.[a-zA-Z0-9\-\.]+$')
+    # Comment patterns
+    comment_pattern = re.compile(r'^[#;]')
+    # Whitespace other than a plain space (tabs, control characters)
+    control_whitespace_pattern = re.compile(r'[^\S ]')
+    # One line, stripped: common well-formed entries (comment, wildcard,
+    # [scheme://]host[/path]) are recognized in a single match, anything
+    # else lands in 'other' and takes the slow path. Every group ends on a
+    # non-space character or right before whitespace, so backtracking never
+    # rescans a run of spaces (keeps matching linear in the line length).
+    url_pattern = re.compile(
+        r'^[^\S\n]*(?:'
+        r'(?P<comment>[#;](?:.*\S)?)'
+        r'|(?P<wildcard>\*\.' + HOSTNAME_REGEX + r')(?!\S)'
+        r'|(?:https?://)?(?P<host>' + HOSTNAME_REGEX + r')(?P<path>/[^\s@]*)?(?!\S)'
+        r'|(?P<other>\S(?:.*\S)?)?'
+        r')[^\S\n]*$',
+        re.MULTILINE
+    )
+    
+    @classmethod
+    def is_valid_hostname(cls, hostname: str) -> bool:
         """Validate hostname according to Netskope rules."""
-        if not hostname:
-            return False
-            
-        # Check for user:password format
-        if '@' in hostname:
-            return False
-            
-        # Check for percent encoding in hostname (not allowed)
-        if '%' in hostname:
-            return False
-            
-        # Split by dots to check each part
-        parts = hostname.split('.')
-        for part in parts:
-            if not part:  # Empty part
-                return False
-            if part.startswith('-') or part.endswith('-'):  # Cannot start/end with dash
-                return False
-            if not re.match(r'^[a-zA-Z0-9\-]+$', part):  # Only letters, digits, dashes
-                return False
-                
-        return True
+        # Single C-level match over all labels: letters, digits, dashes, no
+        # leading/trailing dash, no empty label. This also rejects '@'
+        # (user:password format) and '%' (percent encoding, use punycode).
+        return cls.hostname_pattern.fullmatch(hostname) is not None
     
-    def is_valid_wildcard(self, url: str) -> bool:
+    @classmethod
+    def is_valid_wildcard(cls, url: str) -> bool:
         """Check if wildcard format is valid."""
-        if not url.startswith('*.'):
-            return False
-            
         # Must have exactly one asterisk at the beginning
-        if url.count('*') != 1:
+        if not url.startswith('*.') or '*' in url[2:]:
             return False
             
         # Check the domain part after *.
-        domain_part = url[2:]  # Remove *.
-        return self.is_valid_hostname(domain_part)
+        return cls.is_valid_hostname(url[2:])
     
     def sanitize_url(self, url: str) -> Optional[str]:
         """Sanitize a single URL according to Netskope rules."""
+        sanitized, message = self._sanitize(url)
+        if message:
+            print(message)
+        return sanitized
+    
+    # The helpers below only depend on class-level patterns, so they are
+    # classmethods
+    @classmethod
+    def _sanitize(cls, url: str) -> Tuple[Optional[str], Optional[str]]:
+        """Sanitize a single URL, returning (url or None, diagnostic or None)."""
         url = url.strip()
         
         # Skip empty lines
         if not url:
-            return None
-            
+            return None, None
+        
+        match = cls.url_pattern.fullmatch(url)
+        if match is None:  # Spans several lines
+            return cls._sanitize_fallback(url)
+        return cls._sanitize_match(match)
+    
+    @classmethod
+    def _sanitize_match(cls, match: Match[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Sanitize a single line matched by url_pattern."""
+        kind = match.lastgroup
+        if kind == 'wildcard':
+            return match.group('wildcard'), None
+        if kind == 'host':
+            return match.group('host'), None
+        if kind == 'path':
+            # Drop the root path, keep anything longer
+            path = match.group('path')
+            if path == '/':
+                return match.group('host'), None
+            return match.group('host') + path, None
+        if kind == 'other':
+            return cls._sanitize_fallback(match.group('other'))
+        # Comment or blank line
+        return None, None
+    
+    @classmethod
+    def _sanitize_fallback(cls, url: str) -> Tuple[Optional[str], Optional[str]]:
+        """Sanitize a stripped URL the fast path could not recognize."""
         # Skip comment lines
-        if self.comment_pattern.match(url):
-            return None
+        if cls.comment_pattern.match(url):
+            return None, None
         
         # Handle wildcard URLs
         if url.startswith('*'):
-            if self.is_valid_wildcard(url):
-                return url
+            if cls.is_valid_wildcard(url):
+                return url, None
             else:
-                print(f"Invalid wildcard format: {url}")
-                return None
+                return None, f"Invalid wildcard format: {url}"
         
         # Remove scheme if present (http/https are ignored)
-        if url.startswith(('http://', 'https://')):
-            parsed = urllib.parse.urlparse(url)
-            # Reconstruct without scheme
-            url = parsed.netloc
-            if parsed.path:
-                url += parsed.path
-            if parsed.query:
-                url += '?' + parsed.query
-            if parsed.fragment:
-                url += '#' + parsed.fragment
+        if url.startswith('http://'):
+            url = url[7:]
+        elif url.startswith('https://'):
+            url = url[8:]
         
         # Check for user:password format
         if '@' in url:
-            print(f"User:password format not supported: {url}")
-            return None
+            return None, f"User:password format not supported: {url}"
         
         # Split URL into hostname and path parts
         if '/' in url:
@@ -108,64 +137,118 @@ class NetskopeURLSanitizer:
             path_part = ''
         
         # Validate hostname
-        if not self.is_valid_hostname(hostname):
-            print(f"Invalid hostname: {hostname}")
-            return None
+        if not cls.is_valid_hostname(hostname):
+            return None, f"Invalid hostname: {hostname}"
+        
+        # Tabs and other control whitespace can't be fixed up, reject them
+        if cls.control_whitespace_pattern.search(url):
+            return None, f"URL contains tabs or control whitespace: {url!r}"
         
         # Check for spaces in the entire URL (should be percent-encoded)
+        message = None
         if ' ' in url:
-            print(f"URL contains unencoded spaces: {url}")
+            message = f"URL contains unencoded spaces: {url}"
             # Try to fix by encoding spaces in path only
             if path_part and ' ' in path_part:
                 path_part = path_part.replace(' ', '%20')
                 url = hostname + path_part
-                print(f"Fixed to: {url}")
+                message += f"\nFixed to: {url}"
             else:
-                return None
+                return None, message
         
         # Remove trailing slash if it's just the root path
         if url.endswith('/') and url.count('/') == 1:
             url = url.rstrip('/')
         
-        return url
+        return url, message
+    
+    @staticmethod
+    def _read_line_blocks(f: TextIO, size: int = 1 << 16) -> Iterator[str]:
+        """Read a file in chunks of about size characters, split on line ends."""
+        # Pieces of an unterminated line are collected and joined once, so
+        # only the newly read chunk is scanned for a line end
+        pending: List[str] = []
+        for chunk in iter(lambda: f.read(size), ''):
+            end = chunk.rfind('\n') + 1
+            if end:
+                pending.append(chunk[:end])
+                yield ''.join(pending)
+                pending = []
+                chunk = chunk[end:]
+            if chunk:
+                pending.append(chunk)
+        if pending:
+            yield ''.join(pending)
     
-    def sanitize_file(self, input_file: str, output_file: Optional[str] = None) -> List[str]:
-        """Sanitize URLs from a text file."""
-        sanitized_urls = []
-        seen_urls: Set[str] = set()
+    def sanitize_file(self, input_file: str, output_file: Optional[str] = None,
+                      sort: bool = True) -> List[str]:
+        """Sanitize URLs from a text file.
+        
+        With sort=False the URLs keep their input order (first occurrence).
+        """
+        # Dict keys keep one entry per URL, no separate seen set needed
+        unique_urls: Dict[str, None] = {}
+        line_count = 0
+        valid_count = 0
+        messages = []
         
         try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            f = open(input_file, 'r', encoding='utf-8', buffering=1 << 20)
         except FileNotFoundError:
             print(f"Error: File '{input_file}' not found.")
             return []
-        except Exception as e:
+        except (OSError, ValueError) as e:
             print(f"Error reading file: {e}")
             return []
         
-        print(f"Processing {len(lines)} lines from {input_file}...")
+        # Match each block of lines at once instead of looping over lines;
+        # diagnostics are collected and printed in one go afterwards
+        with f:
+            blocks = self._read_line_blocks(f)
+            while True:
+                # Only reading and decoding are reported as read errors
+                try:
+                    block = next(blocks, None)
+                except (OSError, UnicodeError) as e:
+                    print(f"Error reading file: {e}")
+                    return []
+                if block is None:
+                    break
+                
+                line_count += block.count('\n') + (0 if block.endswith('\n') else 1)
+                for match in self.url_pattern.finditer(block):
+                    sanitized, message = self._sanitize_match(match)
+                    if message:
+                        messages.append(message)
+                    if sanitized:
+                        unique_urls[sanitized] = None
+                        valid_count += 1
         
-        for line_num, line in enumerate(lines, 1):
-            sanitized = self.sanitize_url(line)
-            
-            if sanitized and sanitized not in seen_urls:
-                sanitized_urls.append(sanitized)
-                seen_urls.add(sanitized)
-            elif sanitized and sanitized in seen_urls:
-                print(f"Duplicate URL removed: {sanitized}")
+        print(f"Processing {line_count} lines from {input_file}...")
         
-        # Sort URLs for consistency
-        sanitized_urls.sort()
+        if messages:
+            print('\n'.join(messages))
+        
+        duplicate_count = valid_count - len(unique_urls)
+        if duplicate_count:
+            print(f"Duplicate URLs removed: {duplicate_count}")
+        
+        # Sort URLs for consistency, dict order is first occurrence otherwise
+        if sort:
+            sanitized_urls = sorted(unique_urls)
+        else:
+            sanitized_urls = list(unique_urls)
         
         # Write to output file if specified
         if output_file:
             try:
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write('# Sanitized URLs for Netskope\n')
-                    f.write(f'# Total URLs: {len(sanitized_urls)}\n\n')
-                    for url in sanitized_urls:
-                        f.write(url + '\n')
+                # Build the whole output up front and write it in one call
+                payload = '# Sanitized URLs for Netskope\n'
+                payload += f'# Total URLs: {len(sanitized_urls)}\n\n'
+                if sanitized_urls:
+                    payload += '\n'.join(sanitized_urls) + '\n'
+                with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                    f.write(payload)
                 print(f"Sanitized URLs written to {output_file}")
             except Exception as e:
                 print(f"Error writing to output file: {e}")
@@ -177,24 +260,23 @@ class NetskopeURLSanitizer:
         print(f"\nSummary:")
         print(f"Total valid URLs: {len(urls)}")
         
-        # Count wildcards
-        wildcards = [url for url in urls if url.startswith('*.')]
-        print(f"Wildcard entries: {len(wildcards)}")
-        
-        # Count by TLD
-        tld_counts = {}
+        # Count wildcards and TLDs in a single pass
+        wildcard_count = 0
+        tld_counts = Counter()
         for url in urls:
             if url.startswith('*.'):
+                wildcard_count += 1
                 domain = url[2:]
             else:
-                domain = url.split('/')[0]  # Get hostname part
+                domain = url.split('/', 1)[0]  # Get hostname part
             
             if '.' in domain:
-                tld = domain.split('.')[-1]
-                tld_counts[tld] = tld_counts.get(tld, 0) + 1
+                tld_counts[domain.rsplit('.', 1)[1]] += 1
+        
+        print(f"Wildcard entries: {wildcard_count}")
         
         print("\nTop TLDs:")
-        for tld, count in sorted(tld_counts.items(), key=lambda x: x[1], reverse=True)[:10]:
+        for tld, count in tld_counts.most_common(10):
             print(f"  .{tld}: {count}")
 
 
@@ -205,6 +287,7 @@ def main():
     parser.add_argument("input_file", help="Input text file containing URLs")
     parser.add_argument("output_file", nargs='?', help="Output file for sanitized URLs")
     parser.add_argument("--no-summary", action="store_true", help="Skip summary output")
+    parser.add_argument("--no-sort", action="store_true", help="Keep input order instead of sorting")
     
     args = parser.parse_args()
     
@@ -216,7 +299,7 @@ def main():
         base_name = args.input_file.rsplit('.', 1)[0]
         output_file = f"{base_name}_sanitized.txt"
     
-    sanitized_urls = sanitizer.sanitize_file(args.input_file, output_file)
+    sanitized_urls = sanitizer.sanitize_file(args.input_file, output_file, sort=not args.no_sort)
     
     if not args.no_summary:
         sanitizer.print_summary(sanitized_urls)
@@ -5,11 +5,21 @@ A script to connect to Netskope tenant via API to manage URL lists.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import getpass
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from tabulate import tabulate
-from urllib.parse import urlparse
+
+
+# Basic FQDN validation, compiled once at import
+FQDN_PATTERN = re.compile(
+    r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?)*$'
+)
+# Host part of a URL ends at the first '/', '?' or '#', as urlparse's netloc does
+HOST_END_PATTERN = re.compile(r'[/?#]')
 
 
 class NetskopeAPIClient:
@@ -21,13 +31,34 @@ class NetskopeAPIClient:
             'Authorization': f'Bearer {self.bearer_token}',
             'Content-Type': 'application/json'
         }
+        
+        # Reuse one pooled connection across API calls instead of opening
+        # a new TCP+TLS connection per request; retry failed connects and
+        # transient status codes only. read=False never retries a read
+        # timeout and re-raises it as-is, so it still surfaces as
+        # requests.exceptions.ReadTimeout after a single 30s wait. Retry-After
+        # headers are ignored so a 429/503 can't stall the session; retries
+        # wait only the short backoff (0s, 0.6s, 1.2s).
+        retry = Retry(
+            total=3,
+            connect=3,
+            read=False,
+            status=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 502, 503, 504],
+            respect_retry_after_header=False,
+            raise_on_status=False
+        )
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        self.session.mount('https://', adapter)
     
     def test_connection(self):
         """Test the API connection and authentication."""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v2/policy/urllist",
-                headers=self.headers,
                 timeout=30
             )
             
@@ -50,9 +81,8 @@ class NetskopeAPIClient:
     def get_url_lists(self):
         """Retrieve all URL lists from the tenant."""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v2/policy/urllist",
-                headers=self.headers,
                 timeout=30
             )
             
@@ -69,9 +99,8 @@ class NetskopeAPIClient:
     def get_url_list_content(self, list_id):
         """Retrieve content of a specific URL list by ID."""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/v2/policy/urllist/{list_id}",
-                headers=self.headers,
                 timeout=30
             )
             
@@ -86,19 +115,29 @@ class NetskopeAPIClient:
             
         except requests.exceptions.RequestException as e:
             raise ValueError(f"Error retrieving URL list content: {str(e)}")
+    
+    def get_all_url_list_contents(self, list_ids, max_workers=8):
+        """Retrieve contents of several URL lists concurrently, in the order given."""
+        # Requests overlap on the shared session; the first failing list
+        # raises the same ValueError as get_url_list_content
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.get_url_list_content, list_id) for list_id in list_ids]
+            try:
+                return [future.result() for future in futures]
+            except ValueError:
+                # Don't wait for queued fetches once one list has failed
+                for future in futures:
+                    future.cancel()
+                raise
 
 
 def validate_tenant_fqdn(fqdn):
     """Validate the tenant FQDN format."""
     # Remove protocol if present
     if fqdn.startswith(('http://', 'https://')):
-        parsed = urlparse(fqdn)
-        fqdn = parsed.netloc
-    
-    # Basic FQDN validation
-    fqdn_pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?)*$'
+        fqdn = HOST_END_PATTERN.split(fqdn.split('://', 1)[1], maxsplit=1)[0]
     
-    if not re.match(fqdn_pattern, fqdn):
+    if not FQDN_PATTERN.match(fqdn):
         raise ValueError("Invalid tenant FQDN format. Please enter a valid domain name (e.g., tenant.goskope.com)")
     
     return fqdn
@@ -153,11 +192,11 @@ def display_url_lists_table(url_lists):
 
 
 def get_user_selection(url_lists):
-    """Get user selection for URL list."""
+    """Get user selection for URL list, or all lists when 'all' is entered."""
     if not url_lists:
         return None
     
-    print(f"\nSelect a URL list (enter number 1-{len(url_lists)} or list name):")
+    print(f"\nSelect a URL list (enter number 1-{len(url_lists)}, list name, or 'all'):")
     
     while True:
         selection = input("Your choice: ").strip()
@@ -183,6 +222,8 @@ def get_user_selection(url_lists):
         elif len(matching_lists) > 1:
             print(f"Multiple URL lists found with name '{selection}'. Please use the number instead.")
             continue
+        elif selection.lower() == 'all':
+            return url_lists
         else:
             print(f"No URL list found with name '{selection}'. Please try again.")
             continue
@@ -265,13 +306,21 @@ def main():
                 selected_list = get_user_selection(displayed_lists)
                 
                 if selected_list:
-                    print(f"\nRetrieving content for '{selected_list.get('name', 'Unknown')}'...")
-                    
-                    # Get detailed content
-                    list_content = client.get_url_list_content(selected_list['id'])
-                    
-                    # Display content
-                    display_url_list_content(list_content)
+                    if isinstance(selected_list, list):
+                        print(f"\nRetrieving content for all {len(selected_list)} URL lists...")
+                        
+                        # Fetch all lists concurrently, display them in table order
+                        list_ids = [url_list['id'] for url_list in selected_list]
+                        for list_content in client.get_all_url_list_contents(list_ids):
+                            display_url_list_content(list_content)
+                    else:
+                        print(f"\nRetrieving content for '{selected_list.get('name', 'Unknown')}'...")
+                        
+                        # Get detailed content
+                        list_content = client.get_url_list_content(selected_list['id'])
+                        
+                        # Display content
+                        display_url_list_content(list_content)
                     
                     # Show main menu and handle choice
                     menu_choice = show_main_menu()